@@ -1,17 +1,25 @@
 import os
 import json
 import asyncio
+import functools
+import hashlib
+import http.cookiejar
+import itertools
+import threading
 import random
 import re
+import time
 import httpx
+import orjson
+from contextlib import asynccontextmanager
+from collections import OrderedDict
 from datetime import datetime
-from urllib.parse import urlparse
-from typing import Optional, List, Dict, Any, Set
-from fastapi import FastAPI, HTTPException
+from typing import Optional, List, Dict, Any, Set, Tuple
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
 from pydantic import BaseModel, Field
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
 import gspread
 from google.oauth2.service_account import Credentials
@@ -32,13 +40,104 @@ GOOGLE_CREDENTIALS_JSON = os.getenv("GOOGLE_CREDENTIALS")
 GOOGLE_SEARCH_KEY = os.getenv("Google_Search_API_KEY") or os.getenv("GOOGLE_SEARCH_KEY")
 GOOGLE_SEARCH_CX = os.getenv("Google_Search_CX") or os.getenv("GOOGLE_SEARCH_CX")
 
+# Column layout of the signal database sheet (A..O).
+SHEET_HEADERS = [
+    "Title", "Score", "Hook", "URL", "Mission", "Lenses",
+    "Score_Evocativeness", "Score_Novelty", "Score_Evidence",
+    "User_Rating", "User_Status", "User_Comment", "Shareable", "Feedback", "Source_Date"
+]
+
+# Maps the UI time filter onto the Custom Search `dateRestrict` parameter.
+DATE_RESTRICTS = {"Past Month": "m1", "Past 3 Months": "m3", "Past 6 Months": "m6", "Past Year": "y1"}
+
+# Static prompt sections, joined once at import. They lead the message so every scan
+# shares the same leading tokens (eligible for OpenAI prompt-prefix caching); the
+# request-specific parts follow.
+PROMPT_PREFIX = "\n\n".join([
+    "ROLE: You are Nesta's Discovery Hub Lead Foresight Researcher.",
+    "LANGUAGE: Use British English spellings consistently across all outputs.",
+    "PROTOCOL: 1. SEARCH using a combination of the 'Suggested Keywords' AND high-friction terms (e.g., 'unregulated', 'banned', 'DIY', 'citizen science', 'stealth startup', 'novel application'). Do NOT rely solely on friction terms.",
+    "2. SELECT best candidates. 3. READ candidates (using 'fetch_article_text') to verify they are real/relevant. 4. DISPLAY cards only for verified signals.",
+    "SEARCH RULE: Do NOT include specific years (e.g., '2024', '2025') or 'since:' operators in your search queries. The search tool automatically applies the correct time filter based on the user's selection.",
+    "TOOL CONTRACT: You MUST call 'fetch_article_text' on a URL before calling 'display_signal_card'. Never display a card based solely on a Google snippet.",
+])
+TECH_CONSTRAINT = "\nCONSTRAINT: Hard Tech / Emerging Tech ONLY."
+GTR_CONSTRAINT = "\nCONSTRAINT: User selected 'Gateway to Research'. You MUST include searches using 'site:gtr.ukri.org' to find relevant projects."
+
+# Assistant stream events that end a run without a result.
+TERMINAL_RUN_EVENTS = {"thread.run.failed", "thread.run.expired", "thread.run.cancelled", "thread.run.incomplete"}
+
+# Keyword pools per mission selector, built once at import. Cross-cutting terms are
+# always included; the None entry is used for any mission not listed.
+def _keyword_pool(*groups: List[str]) -> List[str]:
+    pool: Set[str] = set(CROSS_CUTTING_KEYWORDS)
+    for group in groups:
+        pool.update(group)
+    return sorted(pool)
+
+KEYWORD_POOLS: Dict[Optional[str], List[str]] = {
+    mission: _keyword_pool(keywords) for mission, keywords in MISSION_KEYWORDS.items()
+}
+KEYWORD_POOLS["All Missions"] = _keyword_pool(*MISSION_KEYWORDS.values())
+KEYWORD_POOLS[None] = _keyword_pool()
+
+# Upper bound on assistant runs in flight, sized to the account's rate-limit tier.
+# Scans wait up to OPENAI_QUEUE_TIMEOUT seconds for a slot before getting a 503.
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "30"))
+OPENAI_QUEUE_TIMEOUT = float(os.getenv("OPENAI_QUEUE_TIMEOUT", "30"))
+OPENAI_RETRY_AFTER = "10"
+_OPENAI_SLOTS = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+
 # --- CLIENT INIT ---
-client = OpenAI(
+# Native async client on a pool sized for many concurrent scans (the SDK default caps
+# at 100 connections) so assistant traffic never queues behind FastAPI's threadpool.
+client = AsyncOpenAI(
     api_key=OPENAI_API_KEY,
-    default_headers={"OpenAI-Beta": "assistants=v2"}
+    default_headers={"OpenAI-Beta": "assistants=v2"},
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+        timeout=60.0,
+    ),
 )
 
-app = FastAPI()
+# Service-account credentials are parsed once at import; the sheet itself opens lazily.
+GOOGLE_SCOPES = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+google_credentials = None
+if GOOGLE_CREDENTIALS_JSON:
+    try:
+        google_credentials = Credentials.from_service_account_info(json.loads(GOOGLE_CREDENTIALS_JSON), scopes=GOOGLE_SCOPES)
+    except Exception as e:
+        print(f"❌ Google Sheets Credentials Error: {e}")
+
+# Shared outbound pool for Google Search and article fetches so keep-alive
+# connections (and their TLS sessions) are reused across requests. HTTP/2 lets concurrent
+# searches multiplex over one connection; hosts without it negotiate HTTP/1.1.
+HTTP_TIMEOUTS = {"google_search": 5.0, "article": 10.0}
+SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+# `fields` trims the response to the three item fields we format (drops pagemap, metatags, etc.).
+SEARCH_BASE_PARAMS = {"key": GOOGLE_SEARCH_KEY, "cx": GOOGLE_SEARCH_CX, "fields": "items(title,link,snippet)"}
+ARTICLE_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
+# The client's jar stores nothing: article sites' cookies (paywall meters especially) must
+# not carry over from one fetch to the next, or every scan would share one "reader".
+# get_article_page keeps a per-fetch store so cookies still survive a redirect chain.
+http_client = httpx.AsyncClient(
+    http2=True,
+    cookies=http.cookiejar.CookieJar(policy=http.cookiejar.DefaultCookiePolicy(allowed_domains=[])),
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=75.0)
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    drain_task = asyncio.create_task(drain_pending_appends())
+    warm_task = asyncio.create_task(asyncio.to_thread(warm_google_sheet))
+    yield
+    warm_task.cancel()
+    drain_task.cancel()
+    await asyncio.to_thread(flush_pending_appends)
+    await http_client.aclose()
+    await client.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # ✅ STRONG CORS CONFIGURATION
 app.add_middleware(
@@ -51,141 +150,429 @@ app.add_middleware(
 
 # --- HELPERS ---
 
+_SHEET_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=1)
+def _authorised_sheet():
+    """Authenticates once and opens the worksheet; failures raise so they are not cached."""
+    g_client = gspread.authorize(google_credentials)
+    return g_client.open_by_key(SHEET_ID).sheet1
+
 def get_google_sheet():
-    """Authenticates and returns the Google Sheet object."""
+    """Returns the Google Sheet object, reusing the authorised client across requests."""
+    if not google_credentials or not SHEET_ID:
+        print("⚠️ Google Sheets credentials missing.")
+        return None
     try:
-        if not GOOGLE_CREDENTIALS_JSON or not SHEET_ID:
-            print("⚠️ Google Sheets credentials missing.")
-            return None
-        creds_dict = json.loads(GOOGLE_CREDENTIALS_JSON)
-        scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-        creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
-        g_client = gspread.authorize(creds)
-        return g_client.open_by_key(SHEET_ID).sheet1
+        with _SHEET_LOCK:
+            return _authorised_sheet()
     except Exception as e:
         print(f"❌ Google Sheets Auth Error: {e}")
         return None
 
+def api_status(error: Exception) -> Optional[int]:
+    """HTTP status behind a gspread APIError (None for network and other errors)."""
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+def refresh_google_sheet(error: Optional[Exception] = None) -> None:
+    """Drops the cached sheet so the next call re-authenticates. With an error, only on a 401."""
+    if error is not None and api_status(error) != 401:
+        return
+    with _SHEET_LOCK:
+        _authorised_sheet.cache_clear()
+    _HEADERS_CHECKED["ts"] = 0.0
+
+def warm_google_sheet() -> None:
+    """Authorises the sheet and checks its headers at startup so the first save skips both."""
+    sheet = get_google_sheet()
+    if sheet: ensure_sheet_headers(sheet)
+
+# Time of the last successful header check; re-verified every HEADERS_CHECK_TTL seconds.
+HEADERS_CHECK_TTL = 300.0
+_HEADERS_CHECKED = {"ts": 0.0}
+
 def ensure_sheet_headers(sheet):
-    expected_headers = [
-        "Title", "Score", "Hook", "URL", "Mission", "Lenses",
-        "Score_Evocativeness", "Score_Novelty", "Score_Evidence",
-        "User_Rating", "User_Status", "User_Comment", "Shareable", "Feedback", "Source_Date"
-    ]
+    if time.time() - _HEADERS_CHECKED["ts"] < HEADERS_CHECK_TTL: return
     try:
         existing_headers = sheet.row_values(1)
-        if existing_headers != expected_headers:
-            sheet.update([expected_headers], 'A1')
+        if existing_headers != SHEET_HEADERS:
+            sheet.update([SHEET_HEADERS], 'A1')
+        _HEADERS_CHECKED["ts"] = time.time()
     except Exception as e:
         print(f"⚠️ Header Check Failed: {e}")
+        refresh_google_sheet(e)
+
+# Bounded TTL caches for repeated tool calls (the assistant often re-runs a search or
+# re-reads a page, within and across scans). Only successful results are stored.
+# Accessed from the event loop only, so no locking is needed.
+SEARCH_CACHE_TTL = 600.0
+ARTICLE_CACHE_TTL = 3600.0
+TOOL_CACHE_MAXSIZE = 512
+_SEARCH_CACHE: "OrderedDict[Any, Tuple[float, str]]" = OrderedDict()
+_ARTICLE_CACHE: "OrderedDict[Any, Tuple[float, str]]" = OrderedDict()
+
+def cache_get(cache: OrderedDict, key: Any, ttl: float) -> Optional[str]:
+    hit = cache.get(key)
+    if hit is None: return None
+    if time.time() - hit[0] >= ttl:
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return hit[1]
+
+def cache_put(cache: OrderedDict, key: Any, value: str) -> None:
+    cache[key] = (time.time(), value)
+    cache.move_to_end(key)
+    while len(cache) > TOOL_CACHE_MAXSIZE: cache.popitem(last=False)
+
+# Concurrent identical tool fetches share one request instead of racing to fill the cache.
+_INFLIGHT_FETCHES: Dict[Any, asyncio.Task] = {}
+
+async def coalesce(key: Any, start) -> str:
+    task = _INFLIGHT_FETCHES.get(key)
+    if task is None:
+        task = asyncio.ensure_future(start())
+        _INFLIGHT_FETCHES[key] = task
+        task.add_done_callback(lambda t: _INFLIGHT_FETCHES.pop(key) if _INFLIGHT_FETCHES.get(key) is t else None)
+    # Shielded so one caller cancelling does not fail the others; the result is cached anyway.
+    return await asyncio.shield(task)
 
 async def fetch_article_text(url: str) -> str:
     """Scrapes the URL to get the actual content for better hooks/validation."""
+    key = str(url or "").strip()
+    cached = cache_get(_ARTICLE_CACHE, key, ARTICLE_CACHE_TTL)
+    if cached is not None: return cached
+    return await coalesce(("article", key), lambda: download_article_text(url, key))
+
+async def get_article_page(url: str) -> httpx.Response:
+    """GETs `url`, following redirects by hand with a cookie store that lives only for this
+    fetch: consent and cookie-check redirects work, but nothing reaches the next fetch."""
+    cookies = httpx.Cookies()
+    request = http_client.build_request("GET", url, headers=ARTICLE_HEADERS, timeout=HTTP_TIMEOUTS["article"])
+    for _ in range(http_client.max_redirects + 1):
+        resp = await http_client.send(request, follow_redirects=False)
+        cookies.extract_cookies(resp)
+        if resp.next_request is None: return resp
+        request = resp.next_request
+        cookies.set_cookie_header(request)
+    raise httpx.TooManyRedirects("Exceeded maximum allowed redirects.", request=request)
+
+async def download_article_text(url: str, key: str) -> str:
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
-        async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
-            resp = await client.get(url, headers=headers)
-            if resp.status_code >= 400:
-                return f"Error: Could not read page (Status {resp.status_code})"
-            
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = '\n'.join(chunk for chunk in chunks if chunk)
-            return text[:2500] + "..."
+        resp = await get_article_page(url)
+        if resp.status_code >= 400:
+            return f"Error: Could not read page (Status {resp.status_code})"
+        # Parsing is CPU-bound; keep it off the event loop so other scans keep streaming.
+        text = await asyncio.to_thread(extract_article_text, resp.text)
+        cache_put(_ARTICLE_CACHE, key, text)
+        return text
     except Exception as e:
         return f"Error reading article: {str(e)}"
 
+# Characters of article text handed back to the model; extraction stops once it has this many.
+ARTICLE_TEXT_LIMIT = 2500
+
+def extract_article_text(html: str) -> str:
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style", "nav", "footer", "header"]):
+        script.decompose()
+    
+    text = soup.get_text()
+    phrases = itertools.chain.from_iterable(line.strip().split("  ") for line in text.splitlines())
+    kept, size = [], -1
+    for chunk in (c for phrase in phrases if (c := phrase.strip())):
+        kept.append(chunk)
+        size += len(chunk) + 1
+        if size >= ARTICLE_TEXT_LIMIT: break
+    return '\n'.join(kept)[:ARTICLE_TEXT_LIMIT] + "..."
+
+# Parsed sheet rows (rejected included) served by /api/saved; any sheet write invalidates.
+RECORDS_TTL = 30.0
+_RECORDS_CACHE: Dict[str, Any] = {"rows": None, "ts": 0.0, "gen": 0}
+_RECORDS_LOCK = threading.Lock()
+
+def invalidate_records_cache() -> None:
+    with _RECORDS_LOCK:
+        _RECORDS_CACHE.update(rows=None, gen=_RECORDS_CACHE["gen"] + 1)
+
 def get_sheet_records(include_rejected: bool = False) -> List[Dict[str, Any]]:
-    sheet = get_google_sheet()
-    if not sheet: return []
-    ensure_sheet_headers(sheet)
+    with _RECORDS_LOCK:
+        gen = _RECORDS_CACHE["gen"]
+        records = _RECORDS_CACHE["rows"]
+        if records is not None and time.time() - _RECORDS_CACHE["ts"] >= RECORDS_TTL:
+            records = None
+    if records is None:
+        sheet = get_google_sheet()
+        if not sheet: return []
+        ensure_sheet_headers(sheet)
+        try:
+            records = read_sheet_records(sheet)
+        except Exception as e:
+            print(f"Read Error: {e}")
+            refresh_google_sheet(e)
+            return []
+        with _RECORDS_LOCK:
+            # Skip the store if a write landed while we were reading.
+            if _RECORDS_CACHE["gen"] == gen:
+                _RECORDS_CACHE.update(rows=records, ts=time.time())
+    if include_rejected: return list(records)
+    return [rec for rec in records if str(rec.get("User_Status", "")).lower() != "rejected"]
+
+def read_sheet_records(sheet) -> List[Dict[str, Any]]:
+    """Parses every data row of an already-opened, header-checked sheet."""
+    rows = sheet.get_all_values()
+    if not rows: return []
+    headers = rows[0]
+    records = []
+    for idx, row in enumerate(itertools.islice(rows, 1, None), start=2):
+        if not any(row): continue
+        # Short rows are padded with "" as zip walks the headers.
+        record = dict(zip(headers, itertools.chain(row, itertools.repeat(""))))
+        record["_row"] = idx
+        records.append(record)
+    return records
+
+# Normalised URL -> sheet row, used to dedupe upserts without reading the whole sheet.
+# Expiry only reads rows past the last one seen; a full column read runs every
+# URL_INDEX_FULL_REFRESH seconds (or on demand) to pick up hand edits and deletions.
+URL_COLUMN = SHEET_HEADERS.index("URL") + 1
+URL_COLUMN_LETTER = chr(ord("A") + URL_COLUMN - 1)
+URL_INDEX_FULL_REFRESH = 600.0
+_URL_ROWS_CACHE: Dict[str, Any] = {"data": {}, "ts": 0.0, "full_ts": 0.0, "last_row": 0}
+_URL_ROWS_LOCK = threading.Lock()
+
+def normalise_url(url: Any) -> str:
+    return str(url or "").strip().lower()
+
+def get_url_rows(sheet, ttl: float = 60.0) -> Dict[str, int]:
+    """Returns the URL -> row index, refreshing it once older than `ttl` (ttl=0 forces a full read)."""
+    with _URL_ROWS_LOCK:
+        now = time.time()
+        if now - _URL_ROWS_CACHE["ts"] < ttl:
+            return _URL_ROWS_CACHE["data"]
+        last_row = _URL_ROWS_CACHE["last_row"]
+        incremental = ttl > 0 and last_row > 0 and now - _URL_ROWS_CACHE["full_ts"] < URL_INDEX_FULL_REFRESH
+    if incremental:
+        # Start on the last row seen, which is on the grid (a range starting past a full grid
+        # is rejected, and gspread's cached row_count drifts too far to guard with), and skip it.
+        try:
+            tail = sheet.get(f"{URL_COLUMN_LETTER}{last_row}:{URL_COLUMN_LETTER}")[1:]
+        except Exception as e:
+            print(f"⚠️ URL Index Tail Read Failed: {e}")
+            incremental = False
+    if incremental:
+        with _URL_ROWS_LOCK:
+            rows = _URL_ROWS_CACHE["data"]
+            for idx, cells in enumerate(tail, start=last_row + 1):
+                key = normalise_url(cells[0] if cells else "")
+                if key: rows.setdefault(key, idx)
+            _URL_ROWS_CACHE.update(ts=time.time(), last_row=max(_URL_ROWS_CACHE["last_row"], last_row + len(tail)))
+        return rows
+    urls = sheet.col_values(URL_COLUMN)
+    rows = {}
+    for idx, url in enumerate(urls[1:], start=2):
+        key = normalise_url(url)
+        if key and key not in rows: rows[key] = idx
+    with _URL_ROWS_LOCK:
+        _URL_ROWS_CACHE.update(data=rows, ts=time.time(), full_ts=time.time(), last_row=max(len(urls), 1))
+    return rows
+
+# First row number of an A1 range such as "Sheet1!A5:O7".
+_UPDATED_RANGE_RE = re.compile(r"[A-Z]+(\d+)(?::[A-Z]+\d+)?$")
+
+def remember_appended_urls(urls: List[Any], append_response: Any) -> None:
+    """Records the rows a batch append landed on, or expires the index if they cannot be determined."""
     try:
-        rows = sheet.get_all_values()
-        if not rows: return []
-        headers = rows[0]
-        records = []
-        for idx, row in enumerate(rows[1:], start=2):
-            if all(cell == "" for cell in row): continue
-            while len(row) < len(headers): row.append("")
-            record = {headers[i]: row[i] for i in range(len(headers))}
-            record["_row"] = idx
-            status = str(record.get("User_Status", "")).lower()
-            if not include_rejected and status == "rejected": continue
-            records.append(record)
-        return records
-    except Exception as e:
-        print(f"Read Error: {e}")
-        return []
+        updated_range = append_response["updates"]["updatedRange"]
+        first_row = int(_UPDATED_RANGE_RE.search(updated_range).group(1))
+    except Exception:
+        with _URL_ROWS_LOCK: _URL_ROWS_CACHE["ts"] = 0.0
+        return
+    with _URL_ROWS_LOCK:
+        for offset, url in enumerate(urls):
+            if isinstance(url, str) and url:
+                _URL_ROWS_CACHE["data"].setdefault(url, first_row + offset)
+        # Skip the appended rows on the next tail read, but only if nothing sits between.
+        if first_row == _URL_ROWS_CACHE["last_row"] + 1:
+            _URL_ROWS_CACHE["last_row"] = first_row + len(urls) - 1
+
+def find_signal_row(sheet, url: str) -> Optional[int]:
+    match_row = get_url_rows(sheet).get(url)
+    # Rows can shift if someone edits the sheet by hand; confirm before overwriting.
+    if match_row and normalise_url(sheet.cell(match_row, URL_COLUMN).value) != url:
+        match_row = get_url_rows(sheet, ttl=0).get(url)
+    return match_row
+
+# New signals are queued and written in one append_rows call per flush window, so a
+# burst of cards costs one Sheets write instead of one each. Keys are normalised URLs
+# (a later upsert of a still-queued URL replaces its row); URL-less rows get unique keys.
+SAVE_FLUSH_INTERVAL = 2.0
+SAVE_FLUSH_MAX_BACKOFF = 60.0
+APPEND_BATCH_SIZE = 500
+_PENDING_APPENDS: Dict[Any, list] = {}
+_PENDING_LOCK = threading.Lock()
+_FLUSH_LOCK = threading.Lock()
+_PENDING_SEQ = itertools.count()
+
+def queue_append(url: str, row_data: list) -> None:
+    with _PENDING_LOCK:
+        _PENDING_APPENDS[url or ("", next(_PENDING_SEQ))] = row_data
+
+def forget_pending(entries: List[tuple]) -> None:
+    """Dequeues written rows, unless a newer row for the same key was queued meanwhile."""
+    with _PENDING_LOCK:
+        for key, row_data, *_ in entries:
+            if _PENDING_APPENDS.get(key) is row_data:
+                del _PENDING_APPENDS[key]
 
-def upsert_signal(signal: Dict[str, Any]) -> None:
+def row_rejected(error: Exception) -> bool:
+    """True when Sheets refused the request itself (bad values, oversized cell), not auth or quota."""
+    status = api_status(error)
+    return status is not None and 400 <= status < 500 and status not in (401, 403, 429)
+
+def write_rows_one_by_one(entries: List[tuple], write) -> None:
+    """Retries a rejected batch row by row; rows Sheets still rejects are logged and dropped."""
+    for entry in entries:
+        try:
+            write([entry])
+        except Exception as e:
+            if not row_rejected(e): raise
+            print(f"⚠️ Dropping unsaveable row for {entry[0]!r}: {e}")
+            forget_pending([entry])
+
+def flush_pending_appends() -> bool:
+    """Writes every queued row; rows stay queued (and are retried) if their write fails.
+    Returns False when a write failed for a reason worth backing off on."""
+    with _FLUSH_LOCK:
+        with _PENDING_LOCK:
+            batch = list(_PENDING_APPENDS.items())
+        if not batch: return True
+        sheet = get_google_sheet()
+        if not sheet: return False
+
+        def write_updates(entries):
+            sheet.batch_update([{"range": f"A{row}:O{row}", "values": [row_data]} for _, row_data, row in entries])
+            forget_pending(entries)
+
+        def write_appends(entries):
+            resp = sheet.append_rows([row_data for _, row_data in entries])
+            remember_appended_urls([key for key, _ in entries], resp)
+            forget_pending(entries)
+
+        try:
+            updates, appends = [], []
+            for key, row_data in batch:
+                # A queued URL may have reached the sheet since it was queued.
+                match_row = find_signal_row(sheet, key) if isinstance(key, str) else None
+                if match_row: updates.append((key, row_data, match_row))
+                else: appends.append((key, row_data))
+            # One bad row must not hold back the rest of its batch (or every later flush).
+            if updates:
+                try: write_updates(updates)
+                except Exception as e:
+                    if not row_rejected(e): raise
+                    write_rows_one_by_one(updates, write_updates)
+            # Chunked so a large backlog stays within Sheets request-size limits; each chunk
+            # is dequeued as soon as it lands so a later failure cannot duplicate it.
+            for start in range(0, len(appends), APPEND_BATCH_SIZE):
+                chunk = appends[start:start + APPEND_BATCH_SIZE]
+                try: write_appends(chunk)
+                except Exception as e:
+                    if not row_rejected(e): raise
+                    write_rows_one_by_one(chunk, write_appends)
+            return True
+        except Exception as e:
+            print(f"Batch Append Error: {e}")
+            refresh_google_sheet(e)
+            return False
+        finally:
+            invalidate_records_cache()
+
+async def drain_pending_appends() -> None:
+    """Flushes every SAVE_FLUSH_INTERVAL, doubling the wait (up to SAVE_FLUSH_MAX_BACKOFF)
+    while writes keep failing so an outage or quota limit is not hammered."""
+    delay = SAVE_FLUSH_INTERVAL
+    while True:
+        await asyncio.sleep(delay)
+        ok = await asyncio.to_thread(flush_pending_appends)
+        delay = SAVE_FLUSH_INTERVAL if ok else min(delay * 2, SAVE_FLUSH_MAX_BACKOFF)
+
+# Sheet column order (A-O) with the value used when a signal omits the field.
+SIGNAL_ROW_DEFAULTS = {
+    "title": "", "score": 0, "hook": "", "url": "", "mission": "", "lenses": "",
+    "score_evocativeness": 0, "score_novelty": 0, "score_evidence": 0,
+    "user_rating": 3, "user_status": "Pending", "user_comment": "",
+    "shareable": "Maybe", "feedback": "", "source_date": "Recent",
+}
+
+# Sheets rejects a whole write if any cell is not a scalar or holds more than this.
+SHEETS_CELL_LIMIT = 50000
+
+def sheet_cell(value: Any) -> Any:
+    """Coerces a signal field into something Sheets will store (lists become "a, b")."""
+    if isinstance(value, (list, tuple, set)): value = ", ".join(str(v) for v in value)
+    elif value is not None and not isinstance(value, (str, int, float, bool)): value = str(value)
+    if isinstance(value, str) and len(value) > SHEETS_CELL_LIMIT: value = value[:SHEETS_CELL_LIMIT]
+    return value
+
+def upsert_signal(signal: Dict[str, Any]) -> Optional[str]:
     sheet = get_google_sheet()
     if not sheet: return
     ensure_sheet_headers(sheet)
     
-    row_data = [
-        signal.get("title", ""), 
-        signal.get("score", 0),
-        signal.get("hook", ""), 
-        signal.get("url", ""), 
-        signal.get("mission", ""),
-        signal.get("lenses", ""), 
-        signal.get("score_evocativeness", 0),
-        signal.get("score_novelty", 0), 
-        signal.get("score_evidence", 0),
-        signal.get("user_rating", 3), 
-        signal.get("user_status", "Pending"),
-        signal.get("user_comment", "") or signal.get("feedback", ""), 
-        signal.get("shareable", "Maybe"),
-        signal.get("feedback", ""),
-        signal.get("source_date", "Recent")
-    ]
+    fields = {**SIGNAL_ROW_DEFAULTS, **signal}
+    fields["user_comment"] = fields["user_comment"] or fields["feedback"]
+    row_data = [sheet_cell(fields[k]) for k in SIGNAL_ROW_DEFAULTS]
 
     try:
-        records = get_sheet_records(include_rejected=True)
-        match_row = None
-        incoming_url = str(signal.get("url", "")).strip().lower()
-        
-        for rec in records:
-            if str(rec.get("URL", "")).strip().lower() == incoming_url:
-                match_row = rec.get("_row")
-                break
+        incoming_url = normalise_url(signal.get("url", ""))
+        match_row = find_signal_row(sheet, incoming_url) if incoming_url else None
         
         if match_row:
             sheet.update(f"A{match_row}:O{match_row}", [row_data])
-        else:
-            sheet.append_row(row_data)
+            invalidate_records_cache()
+            return "updated"
+        queue_append(incoming_url, row_data)
+        return "queued"
     except Exception as e:
         print(f"Upsert Error: {e}")
+        refresh_google_sheet(e)
 
 async def perform_google_search(query, date_restrict="m1", requested_results: int = 8):
     if not GOOGLE_SEARCH_KEY or not GOOGLE_SEARCH_CX: return "System Error: Search Config Missing"
     target_results = max(1, min(20, requested_results))
+    key = (str(query or "").strip().lower(), date_restrict, target_results)
+    cached = cache_get(_SEARCH_CACHE, key, SEARCH_CACHE_TTL)
+    if cached is not None:
+        print(f"🔍 Search cache hit: '{query}' ({date_restrict})")
+        return cached
+    return await coalesce(("search", key), lambda: search_google(query, date_restrict, target_results, key))
+
+async def search_google(query, date_restrict: str, target_results: int, key: tuple) -> str:
     print(f"🔍 Searching: '{query}' ({date_restrict})...")
-    url = "https://www.googleapis.com/customsearch/v1"
     results = []
     start_index = 1
-    async with httpx.AsyncClient() as http_client:
-        try:
-            while len(results) < target_results:
-                params = {
-                    "key": GOOGLE_SEARCH_KEY, "cx": GOOGLE_SEARCH_CX,
-                    "q": query, "num": 10, "start": start_index, "dateRestrict": date_restrict
-                }
-                resp = await http_client.get(url, params=params)
-                if resp.status_code != 200: break
-                items = resp.json().get("items", [])
-                if not items: break
-                for item in items:
-                    results.append(f"Title: {item.get('title')}\nLink: {item.get('link')}\nSnippet: {item.get('snippet', '')}")
-                if len(items) < 10: break
-                start_index += 10
-            return "\n\n".join(results[:target_results])
-        except Exception as e: return f"Search Exception: {str(e)}"
+    complete = True
+    try:
+        while len(results) < target_results:
+            # Ask only for what is still needed (the API caps a page at 10).
+            page_size = min(10, target_results - len(results))
+            params = {**SEARCH_BASE_PARAMS, "q": query, "start": start_index, "num": page_size, "dateRestrict": date_restrict}
+            resp = await http_client.get(SEARCH_URL, params=params, timeout=HTTP_TIMEOUTS["google_search"])
+            if resp.status_code != 200:
+                complete = False
+                break
+            items = orjson.loads(resp.content).get("items", [])
+            if not items: break
+            for item in items:
+                results.append(f"Title: {item.get('title')}\nLink: {item.get('link')}\nSnippet: {item.get('snippet', '')}")
+            if len(items) < page_size: break
+            start_index += page_size
+        text = "\n\n".join(results[:target_results])
+        # Don't remember quota/HTTP failures, or they would outlive the outage.
+        if complete: cache_put(_SEARCH_CACHE, key, text)
+        return text
+    except Exception as e: return f"Search Exception: {str(e)}"
 
 # --- ENDPOINTS ---
 class ChatRequest(BaseModel):
@@ -195,149 +582,217 @@ class ChatRequest(BaseModel):
     tech_mode: bool = False
     mission: str = "All Missions" # Added mission field to request
 
-@app.post("/api/chat")
-async def chat_endpoint(req: ChatRequest):
+async def handle_tool_call(tool, req: ChatRequest, accumulated_signals: List[Dict[str, Any]], seen_urls: Set[str]) -> Optional[Dict[str, str]]:
+    """Runs one assistant tool call and returns its tool output (None for unknown tools)."""
+    if tool.function.name == "perform_web_search":
+        args = orjson.loads(tool.function.arguments)
+        res = await perform_google_search(args.get("query"), DATE_RESTRICTS.get(req.time_filter, "m1"))
+        return {"tool_call_id": tool.id, "output": res}
+    elif tool.function.name == "fetch_article_text":
+        args = orjson.loads(tool.function.arguments)
+        content = await fetch_article_text(args.get("url"))
+        return {"tool_call_id": tool.id, "output": content}
+    elif tool.function.name == "display_signal_card":
+        args = orjson.loads(tool.function.arguments)
+        card = {
+            "title": args.get("title"), "url": args.get("final_url") or args.get("url"),
+            "hook": args.get("hook"), "score": args.get("score"),
+            "mission": args.get("mission", "General"),
+            "lenses": args.get("lenses", ""),
+            "score_novelty": args.get("score_novelty", 0),
+            "score_evidence": args.get("score_evidence", 0),
+            "score_evocativeness": args.get("score_evocativeness", 0),
+            "source_date": args.get("published_date", "Recent"),
+            "ui_type": "signal_card"
+        }
+        if card["url"] and card["url"] not in seen_urls:
+            accumulated_signals.append(card)
+            seen_urls.add(card["url"])
+            # Upsert in thread to prevent blocking cancellation
+            try: await asyncio.to_thread(upsert_signal, card)
+            except: pass
+            return {"tool_call_id": tool.id, "output": "displayed"}
+        return {"tool_call_id": tool.id, "output": "duplicate_skipped"}
+    return None
+
+async def run_scan(req: ChatRequest):
+    """Runs one assistant scan for the request; see chat_endpoint for request coalescing."""
     run = None
     try:
         # 1. Get Current Date
         today_str = datetime.now().strftime("%Y-%m-%d")
         print(f"Incoming: {req.message} | Mission: {req.mission} | Date: {today_str}")
         
-        # 2. Select Keywords based on Mission
-        relevant_keywords_set = set()
-        if req.mission in MISSION_KEYWORDS:
-            relevant_keywords_set.update(MISSION_KEYWORDS[req.mission])
-        elif req.mission == "All Missions":
-             for key in MISSION_KEYWORDS:
-                 relevant_keywords_set.update(MISSION_KEYWORDS[key])
-        
-        # Always include cross-cutting
-        relevant_keywords_set.update(CROSS_CUTTING_KEYWORDS)
-        
-        # Convert to list for random.sample
-        relevant_keywords_list = list(relevant_keywords_set)
+        # 2. Select Keywords based on Mission (unknown missions fall back to cross-cutting only)
+        relevant_keywords_list = KEYWORD_POOLS.get(req.mission, KEYWORD_POOLS[None])
         
         # Random sample to keep prompt size manageable and varied
         selected_keywords = random.sample(relevant_keywords_list, min(len(relevant_keywords_list), 15))
         keywords_str = ", ".join(selected_keywords)
 
-        # 3. Construct Prompt
+        # 3. Construct Prompt (static prefix first, then this request's parts; one join at the end)
+        bias_sources = req.source_types
         prompt_parts = [
-            req.message,
-            f"CURRENT DATE: {today_str}",
-            "ROLE: You are Nesta's Discovery Hub Lead Foresight Researcher.",
-            "LANGUAGE: Use British English spellings consistently across all outputs.",
-            f"SUGGESTED KEYWORDS: {keywords_str}",
-            "PROTOCOL: 1. SEARCH using a combination of the 'Suggested Keywords' AND high-friction terms (e.g., 'unregulated', 'banned', 'DIY', 'citizen science', 'stealth startup', 'novel application'). Do NOT rely solely on friction terms.",
-            "2. SELECT best candidates. 3. READ candidates (using 'fetch_article_text') to verify they are real/relevant. 4. DISPLAY cards only for verified signals.",
-            "SEARCH RULE: Do NOT include specific years (e.g., '2024', '2025') or 'since:' operators in your search queries. The search tool automatically applies the correct time filter based on the user's selection.",
-            "TOOL CONTRACT: You MUST call 'fetch_article_text' on a URL before calling 'display_signal_card'. Never display a card based solely on a Google snippet."
+            PROMPT_PREFIX, "\n\n", req.message, "\n\nCURRENT DATE: ", today_str,
+            "\n\nSUGGESTED KEYWORDS: ", keywords_str
         ]
-        prompt = "\n\n".join(prompt_parts)
-        
-        if req.tech_mode: prompt += "\nCONSTRAINT: Hard Tech / Emerging Tech ONLY."
+        if req.tech_mode: prompt_parts.append(TECH_CONSTRAINT)
         
         # Explicit instruction for Gateway to Research
-        bias_sources = req.source_types
-        if "Gateway to Research" in bias_sources:
-            prompt += "\nCONSTRAINT: User selected 'Gateway to Research'. You MUST include searches using 'site:gtr.ukri.org' to find relevant projects."
+        if "Gateway to Research" in bias_sources: prompt_parts.append(GTR_CONSTRAINT)
         
-        prompt += f"\nCONSTRAINT: Time Horizon {req.time_filter}. Bias Source Types: {', '.join(bias_sources)}."
+        prompt_parts.append(f"\nCONSTRAINT: Time Horizon {req.time_filter}. Bias Source Types: {', '.join(bias_sources)}.")
+        prompt = "".join(prompt_parts)
         
-        run = await asyncio.to_thread(
-            client.beta.threads.create_and_run,
-            assistant_id=ASSISTANT_ID,
-            thread={"messages": [{"role": "user", "content": prompt}]}
-        )
-
         accumulated_signals = []
         seen_urls = set()
 
-        # Polling Loop with Cancellation Support
-        while True:
-            try:
-                run_status = await asyncio.to_thread(client.beta.threads.runs.retrieve, thread_id=run.thread_id, run_id=run.id)
-                
-                if run_status.status == 'requires_action':
-                    tool_calls = run_status.required_action.submit_tool_outputs.tool_calls
-                    tool_outputs = []
-                    
-                    for tool in tool_calls:
-                        if tool.function.name == "perform_web_search":
-                            args = json.loads(tool.function.arguments)
-                            d_map = {"Past Month": "m1", "Past 3 Months": "m3", "Past 6 Months": "m6", "Past Year": "y1"}
-                            res = await perform_google_search(args.get("query"), d_map.get(req.time_filter, "m1"))
-                            tool_outputs.append({"tool_call_id": tool.id, "output": res})
-                        elif tool.function.name == "fetch_article_text":
-                            args = json.loads(tool.function.arguments)
-                            content = await fetch_article_text(args.get("url"))
-                            tool_outputs.append({"tool_call_id": tool.id, "output": content})
-                        elif tool.function.name == "display_signal_card":
-                            args = json.loads(tool.function.arguments)
-                            card = {
-                                "title": args.get("title"), "url": args.get("final_url") or args.get("url"),
-                                "hook": args.get("hook"), "score": args.get("score"),
-                                "mission": args.get("mission", "General"),
-                                "lenses": args.get("lenses", ""),
-                                "score_novelty": args.get("score_novelty", 0),
-                                "score_evidence": args.get("score_evidence", 0),
-                                "score_evocativeness": args.get("score_evocativeness", 0),
-                                "source_date": args.get("published_date", "Recent"),
-                                "ui_type": "signal_card"
-                            }
-                            if card["url"] and card["url"] not in seen_urls:
-                                accumulated_signals.append(card)
-                                seen_urls.add(card["url"])
-                                # Upsert in thread to prevent blocking cancellation
-                                try: await asyncio.to_thread(upsert_signal, card)
-                                except: pass
-                                tool_outputs.append({"tool_call_id": tool.id, "output": "displayed"})
-                            else:
-                                tool_outputs.append({"tool_call_id": tool.id, "output": "duplicate_skipped"})
-
-                    await asyncio.to_thread(client.beta.threads.runs.submit_tool_outputs, thread_id=run.thread_id, run_id=run.id, tool_outputs=tool_outputs)
-
-                elif run_status.status == 'completed':
-                    if accumulated_signals:
-                        return {"ui_type": "signal_list", "items": accumulated_signals}
-                    else:
-                        msgs = await asyncio.to_thread(client.beta.threads.messages.list, thread_id=run.thread_id)
-                        return {"ui_type": "text", "content": msgs.data[0].content[0].text.value}
-                
-                elif run_status.status in ['failed', 'expired', 'cancelled']:
-                    return {"ui_type": "text", "content": f"System Error: {run_status.last_error}"}
-                
-                await asyncio.sleep(1)
-
-            except asyncio.CancelledError:
+        # Event stream with Cancellation Support: tool calls arrive as soon as the run
+        # pauses for them, and each submission opens the stream for the next leg of the run.
+        try:
+            await asyncio.wait_for(_OPENAI_SLOTS.acquire(), timeout=OPENAI_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=503, detail="Scanner is at capacity, please retry shortly.",
+                headers={"Retry-After": OPENAI_RETRY_AFTER}
+            )
+        try:
+            stream_manager = client.beta.threads.create_and_run_stream(
+                assistant_id=ASSISTANT_ID,
+                thread={"messages": [{"role": "user", "content": prompt}]}
+            )
+            while stream_manager is not None:
+                async with stream_manager as stream:
+                    stream_manager = None
+                    async for event in stream:
+                        if event.event == "thread.run.created":
+                            run = event.data
+
+                        elif event.event == "thread.run.requires_action":
+                            run = event.data
+                            # Searches and page fetches in one step are independent, so overlap them.
+                            # Cards are recorded before handle_tool_call first awaits, keeping their order.
+                            outputs = await asyncio.gather(*(
+                                handle_tool_call(tool, req, accumulated_signals, seen_urls)
+                                for tool in run.required_action.submit_tool_outputs.tool_calls
+                            ))
+                            tool_outputs = [output for output in outputs if output is not None]
+                            stream_manager = client.beta.threads.runs.submit_tool_outputs_stream(
+                                thread_id=run.thread_id, run_id=run.id, tool_outputs=tool_outputs
+                            )
+                            break
+
+                        elif event.event == "thread.run.completed":
+                            if accumulated_signals:
+                                return {"ui_type": "signal_list", "items": accumulated_signals}
+                            msgs = await client.beta.threads.messages.list(thread_id=event.data.thread_id)
+                            return {"ui_type": "text", "content": msgs.data[0].content[0].text.value}
+
+                        elif event.event in TERMINAL_RUN_EVENTS:
+                            return {"ui_type": "text", "content": f"System Error: {event.data.last_error}"}
+
+                        elif event.event == "error":
+                            return {"ui_type": "text", "content": f"System Error: {event.data.message}"}
+
+            return {"ui_type": "text", "content": "System Error: Assistant stream ended unexpectedly."}
+
+        except asyncio.CancelledError:
+            if run:
                 print(f"🛑 Scan cancelled by user. Terminating Run {run.id}...")
                 try:
-                    await asyncio.to_thread(client.beta.threads.runs.cancel, thread_id=run.thread_id, run_id=run.id)
+                    await client.beta.threads.runs.cancel(thread_id=run.thread_id, run_id=run.id)
                 except Exception as e:
                     print(f"Error cancelling run: {e}")
-                raise # Re-raise to allow FastAPI to close the connection properly
+            raise # Re-raise to allow FastAPI to close the connection properly
+        finally:
+            _OPENAI_SLOTS.release()
+
+    except HTTPException:
+        raise
 
     except Exception as e:
         print(f"Server Error: {e}")
         # Only check for cancellation if 'run' was created
         if isinstance(e, asyncio.CancelledError) and run:
             try:
-                await asyncio.to_thread(client.beta.threads.runs.cancel, thread_id=run.thread_id, run_id=run.id)
+                await client.beta.threads.runs.cancel(thread_id=run.thread_id, run_id=run.id)
             except Exception:
                 pass
         raise HTTPException(status_code=500, detail=str(e))
 
+# Identical scans in flight at the same time share one assistant run.
+DISCONNECT_POLL_INTERVAL = 1.0
+_INFLIGHT_SCANS: Dict[str, Dict[str, Any]] = {}
+
+def scan_key(req: ChatRequest) -> str:
+    """Hashes the request fields that shape the prompt (the keyword sample is drawn later)."""
+    fields = [req.message.strip().lower(), req.time_filter, sorted(req.source_types), req.tech_mode, req.mission]
+    return hashlib.blake2b(orjson.dumps(fields), digest_size=16).hexdigest()
+
+def cancel_scan(key: str, scan: Dict[str, Any]) -> None:
+    """Unlists the shared scan before cancelling it, so a re-run starts fresh instead of joining it."""
+    if _INFLIGHT_SCANS.get(key) is scan: del _INFLIGHT_SCANS[key]
+    scan["task"].cancel()
+
+async def wait_for_disconnect(request: Request) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+@app.post("/api/chat")
+async def chat_endpoint(req: ChatRequest, request: Request):
+    key = scan_key(req)
+    scan = _INFLIGHT_SCANS.get(key)
+    # A cancelled run can't be joined; start a fresh one in its place.
+    if scan is None or scan["task"].cancelled():
+        scan = {"task": asyncio.create_task(run_scan(req)), "waiters": 0}
+        _INFLIGHT_SCANS[key] = scan
+
+        def _forget(task: asyncio.Task, scan=scan) -> None:
+            if _INFLIGHT_SCANS.get(key) is scan: del _INFLIGHT_SCANS[key]
+            if not task.cancelled(): task.exception()  # mark retrieved even if every caller left
+
+        scan["task"].add_done_callback(_forget)
+    else:
+        print(f"♻️ Joining in-flight scan for: {req.message}")
+
+    # Starlette does not cancel handlers when the browser goes away (e.g. the Stop
+    # button), so watch for the disconnect and stop paying for a run nobody will read.
+    scan["waiters"] += 1
+    disconnect = asyncio.create_task(wait_for_disconnect(request))
+    try:
+        await asyncio.wait({scan["task"], disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        if scan["task"].cancelled(): return {"ui_type": "text", "content": "Scan cancelled."}
+        if scan["task"].done(): return scan["task"].result()
+        print(f"🛑 Client disconnected from scan: {req.message}")
+        # Only the last caller to leave cancels the shared run.
+        if scan["waiters"] == 1: cancel_scan(key, scan)
+        return {"ui_type": "text", "content": "Scan cancelled."}
+    except asyncio.CancelledError:
+        if scan["waiters"] == 1: cancel_scan(key, scan)
+        raise
+    finally:
+        disconnect.cancel()
+        scan["waiters"] -= 1
+
 @app.get("/api/saved")
-def get_saved(): return get_sheet_records()
+async def get_saved(limit: Optional[int] = Query(None, ge=1), offset: int = Query(0, ge=0)):
+    """Saved signals in sheet order. `limit`/`offset` page back from the newest rows."""
+    records = await asyncio.to_thread(get_sheet_records)
+    if limit is None and not offset: return records
+    end = len(records) - offset
+    start = 0 if limit is None else end - limit
+    return records[max(0, start):max(0, end)]
 
 @app.post("/api/update")
-def update_sig(req: Dict[str, Any]): 
+async def update_sig(req: Dict[str, Any]): 
     try:
-        upsert_signal(req)
-        return {"status": "updated"}
+        status = await asyncio.to_thread(upsert_signal, req)
     except Exception as e:
         print(f"Update Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    # upsert_signal returns None when the sheet is unavailable or the write failed.
+    if status is None: raise HTTPException(status_code=500, detail="Update failed")
+    return {"status": status}
 
 # --- STATIC FILE SERVING ---
 @app.get("/")
@@ -0,0 +1,106 @@
+import json
+import os
+import re
+import sys
+from types import SimpleNamespace
+
+# main.py builds its OpenAI client at import time.
+os.environ.setdefault("OPENAI_API_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gspread
+import pytest
+import requests
+
+import main
+
+
+def sheets_error(status):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps({"error": {"code": status, "message": "Invalid values", "status": "INVALID_ARGUMENT"}}).encode()
+    return gspread.exceptions.APIError(response)
+
+
+def check_cells(rows):
+    """Rejects the whole write, as Sheets does, if any cell is not a storable scalar."""
+    for row in rows:
+        for value in row:
+            if isinstance(value, (list, dict, set, tuple)) or len(str(value)) > main.SHEETS_CELL_LIMIT:
+                raise sheets_error(400)
+
+
+class FakeWorksheet:
+    """In-memory stand-in for the gspread calls main.py makes."""
+
+    def __init__(self, rows=None, row_count=1000):
+        self.rows = [list(main.SHEET_HEADERS)] + [list(r) for r in rows or []]
+        self.row_count = row_count
+        self.grid_rows = None  # when set, reads starting below this row fail as on a full grid
+        self.calls = []
+        self.fail_get = False
+
+    def row_values(self, row):
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def update(self, range_name, values):
+        if not isinstance(range_name, str):  # update([headers], "A1")
+            range_name, values = values, range_name
+        self.calls.append(("update", range_name))
+        check_cells(values)
+        row = int(re.match(r"[A-Z]+(\d+)", range_name).group(1))
+        while len(self.rows) < row: self.rows.append([])
+        self.rows[row - 1] = [str(v) for v in values[0]]
+
+    def cell(self, row, col):
+        values = self.row_values(row)
+        return SimpleNamespace(value=values[col - 1] if len(values) >= col else "")
+
+    def col_values(self, col):
+        self.calls.append(("col_values", col))
+        return [r[col - 1] if len(r) >= col else "" for r in self.rows]
+
+    def get(self, range_name):
+        self.calls.append(("get", range_name))
+        if self.fail_get: raise RuntimeError("exceeds grid limits")
+        start = int(re.match(r"[A-Z]+(\d+)", range_name).group(1))
+        if self.grid_rows is not None and start > self.grid_rows: raise sheets_error(400)
+        col = main.URL_COLUMN
+        tail = [[r[col - 1]] if len(r) >= col and r[col - 1] else [] for r in self.rows[start - 1:]]
+        while tail and not tail[-1]: tail.pop()
+        return tail
+
+    def append_rows(self, rows, **kwargs):
+        self.calls.append(("append_rows", len(rows)))
+        check_cells(rows)
+        first = len(self.rows) + 1
+        self.rows.extend([str(v) for v in r] for r in rows)
+        return {"updates": {"updatedRange": f"Sheet1!A{first}:O{len(self.rows)}"}}
+
+    def batch_update(self, data, **kwargs):
+        self.calls.append(("batch_update", len(data)))
+        check_cells(row for entry in data for row in entry["values"])
+        for entry in data:
+            self.update(entry["range"], entry["values"])
+
+    def get_all_values(self):
+        return [list(r) for r in self.rows]
+
+
+def signal_row(title, url):
+    return [title, "5", "", url] + [""] * (len(main.SHEET_HEADERS) - 4)
+
+
+def titles(sheet):
+    return [r[0] for r in sheet.rows[1:]]
+
+
+@pytest.fixture
+def sheet(monkeypatch):
+    fake = FakeWorksheet()
+    monkeypatch.setattr(main, "get_google_sheet", lambda: fake)
+    main._PENDING_APPENDS.clear()
+    main._URL_ROWS_CACHE.update(data={}, ts=0.0, full_ts=0.0, last_row=0)
+    main._RECORDS_CACHE.update(rows=None, ts=0.0)
+    main._HEADERS_CHECKED["ts"] = 0.0
+    return fake
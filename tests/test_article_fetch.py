@@ -0,0 +1,40 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+
+def cookie_check_site(request):
+    """Sets a cookie, redirects, and only serves the article if the cookie came back."""
+    if request.url.path == "/article":
+        return httpx.Response(302, headers={"Location": "/article/check", "Set-Cookie": "consent=yes; Path=/"})
+    if "consent=yes" in request.headers.get("cookie", ""):
+        return httpx.Response(200, text="<html><body><p>The article.</p></body></html>")
+    return httpx.Response(200, text="<html><body><p>Please enable cookies</p></body></html>")
+
+
+@pytest.fixture
+def site(monkeypatch):
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("cookie"))
+        return cookie_check_site(request)
+
+    monkeypatch.setattr(main.http_client, "_transport", httpx.MockTransport(handler))
+    main._ARTICLE_CACHE.clear()
+    return seen
+
+
+def test_cookies_survive_a_redirect_chain(site):
+    text = asyncio.run(main.fetch_article_text("https://news.example/article"))
+    assert text.startswith("The article.")
+
+
+def test_cookies_do_not_outlive_the_fetch(site):
+    asyncio.run(main.fetch_article_text("https://news.example/article"))
+    asyncio.run(main.fetch_article_text("https://news.example/article?again"))
+    assert site == [None, "consent=yes", None, "consent=yes"]
+    assert not main.http_client.cookies
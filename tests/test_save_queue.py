@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+
+import main
+from conftest import sheets_error, signal_row, titles
+
+
+def test_queued_signal_is_flushed_then_updated_in_place(sheet):
+    assert main.upsert_signal({"title": "a", "url": "https://A.example"}) == "queued"
+    assert main.upsert_signal({"title": "b", "url": "https://b.example"}) == "queued"
+    # Re-saving a still-queued URL replaces its pending row.
+    assert main.upsert_signal({"title": "a2", "url": "https://a.example"}) == "queued"
+
+    main.flush_pending_appends()
+    assert titles(sheet) == ["a2", "b"]
+    assert sheet.calls.count(("append_rows", 2)) == 1
+    assert not main._PENDING_APPENDS
+
+    assert main.upsert_signal({"title": "a3", "url": "https://a.example"}) == "updated"
+    assert titles(sheet) == ["a3", "b"]
+    assert [r["Title"] for r in main.get_sheet_records()] == ["a3", "b"]
+
+
+def test_flush_updates_rows_that_reached_the_sheet_while_queued(sheet):
+    main.upsert_signal({"title": "a", "url": "https://a.example"})
+    sheet.rows.append(signal_row("by hand", "https://a.example"))
+    main._URL_ROWS_CACHE["ts"] = 0.0
+
+    main.flush_pending_appends()
+    assert titles(sheet) == ["a"]
+    assert ("batch_update", 1) in sheet.calls
+
+
+def test_update_endpoint_reports_failed_writes(monkeypatch):
+    monkeypatch.setattr(main, "get_google_sheet", lambda: None)
+    response = TestClient(main.app).post("/api/update", json={"url": "https://a.example"})
+    assert response.status_code == 500
+
+
+def test_list_values_are_saved_as_text(sheet):
+    main.upsert_signal({"title": "a", "url": "https://a.example", "lenses": ["Tech", "Social"]})
+    main.flush_pending_appends()
+    assert sheet.rows[1][main.SHEET_HEADERS.index("Lenses")] == "Tech, Social"
+
+
+def test_rejected_row_is_dropped_without_blocking_the_rest(sheet):
+    bad = ["bad", 0, "", "https://bad.example", "", ["Tech", "Social"]] + [""] * 9
+    main.queue_append("https://bad.example", bad)
+    main.upsert_signal({"title": "good", "url": "https://good.example"})
+
+    assert main.flush_pending_appends()
+    assert titles(sheet) == ["good"]
+    assert not main._PENDING_APPENDS
+
+
+def test_transient_failure_keeps_rows_queued(sheet, monkeypatch):
+    main.upsert_signal({"title": "a", "url": "https://a.example"})
+    def unavailable(rows, **kwargs): raise sheets_error(503)
+    monkeypatch.setattr(sheet, "append_rows", unavailable)
+
+    assert not main.flush_pending_appends()
+    assert "https://a.example" in main._PENDING_APPENDS
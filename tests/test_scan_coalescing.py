@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+import main
+
+
+class FakeRequest:
+    """Stands in for the Starlette request; `leave()` simulates the browser disconnecting."""
+
+    def __init__(self):
+        self.gone = asyncio.Event()
+
+    async def is_disconnected(self):
+        await self.gone.wait()
+        return True
+
+    def leave(self):
+        self.gone.set()
+
+
+@pytest.fixture(autouse=True)
+def no_inflight_scans():
+    main._INFLIGHT_SCANS.clear()
+    yield
+    main._INFLIGHT_SCANS.clear()
+
+
+async def quick_scan(req):
+    return {"ui_type": "text", "content": "fresh"}
+
+
+def test_cancelled_scan_is_replaced_not_joined(monkeypatch):
+    monkeypatch.setattr(main, "run_scan", quick_scan)
+
+    async def scenario():
+        dead = asyncio.create_task(asyncio.Event().wait())
+        dead.cancel()
+        await asyncio.gather(dead, return_exceptions=True)
+        req = main.ChatRequest(message="x")
+        main._INFLIGHT_SCANS[main.scan_key(req)] = {"task": dead, "waiters": 0}
+
+        assert (await main.chat_endpoint(req, FakeRequest()))["content"] == "fresh"
+
+    asyncio.run(scenario())
+
+
+def test_rerun_after_cancel_starts_a_fresh_scan(monkeypatch):
+    async def scenario():
+        started, cancelling, release = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+        async def slow_scan(req):
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                # Hold the task open, as run_scan does while it calls runs.cancel.
+                cancelling.set()
+                await release.wait()
+                raise
+
+        monkeypatch.setattr(main, "run_scan", slow_scan)
+        first = FakeRequest()
+        request = asyncio.create_task(main.chat_endpoint(main.ChatRequest(message="x"), first))
+        await started.wait()
+        scan_task = main._INFLIGHT_SCANS[main.scan_key(main.ChatRequest(message="x"))]["task"]
+        first.leave()
+        assert (await request)["content"] == "Scan cancelled."
+        await cancelling.wait()
+
+        monkeypatch.setattr(main, "run_scan", quick_scan)
+        # Bounded so a regression (joining the dying scan) fails instead of hanging.
+        rerun = await asyncio.wait_for(main.chat_endpoint(main.ChatRequest(message="x"), FakeRequest()), 5)
+        assert rerun["content"] == "fresh"
+
+        release.set()
+        await asyncio.gather(scan_task, return_exceptions=True)
+
+    asyncio.run(scenario())
@@ -0,0 +1,39 @@
+import main
+from conftest import signal_row, titles
+
+
+def test_hand_added_rows_are_found_by_the_tail_read(sheet):
+    main.upsert_signal({"title": "a", "url": "https://a.example"})
+    main.flush_pending_appends()
+    sheet.rows.append(signal_row("by hand", "https://hand.example"))
+    main._URL_ROWS_CACHE["ts"] = 0.0
+
+    assert main.upsert_signal({"title": "edited", "url": "https://hand.example"}) == "updated"
+    assert titles(sheet) == ["a", "edited"]
+    assert ("get", "D2:D") in sheet.calls
+
+
+def test_failed_tail_read_falls_back_to_a_full_read(sheet):
+    main.upsert_signal({"title": "a", "url": "https://a.example"})
+    main.flush_pending_appends()
+    sheet.rows.append(signal_row("by hand", "https://hand.example"))
+    main._URL_ROWS_CACHE["ts"] = 0.0
+    sheet.fail_get = True
+    sheet.calls.clear()
+
+    assert main.upsert_signal({"title": "edited", "url": "https://hand.example"}) == "updated"
+    assert ("col_values", main.URL_COLUMN) in sheet.calls
+
+
+def test_tail_read_stays_on_a_full_grid(sheet):
+    # gspread's cached row_count overstates the grid once appends have grown it.
+    sheet.row_count = 10 ** 6
+    main.upsert_signal({"title": "a", "url": "https://a.example"})
+    main.flush_pending_appends()
+    sheet.grid_rows = len(sheet.rows)
+    main._URL_ROWS_CACHE["ts"] = 0.0
+    sheet.calls.clear()
+
+    assert main.upsert_signal({"title": "b", "url": "https://b.example"}) == "queued"
+    assert ("get", "D2:D") in sheet.calls
+    assert ("col_values", main.URL_COLUMN) not in sheet.calls